@@ -41,13 +41,6 @@ from prowler.lib.outputs.json.json import close_json
 from prowler.lib.outputs.outputs import extract_findings_statistics
 from prowler.lib.outputs.slack import send_slack_message
 from prowler.lib.outputs.summary_table import display_summary_table
-from prowler.providers.aws.lib.s3.s3 import send_to_s3_bucket
-from prowler.providers.aws.lib.security_hub.security_hub import (
-    batch_send_to_security_hub,
-    prepare_security_hub_findings,
-    resolve_security_hub_previous_findings,
-    verify_security_hub_integration_enabled_per_region,
-)
 from prowler.providers.common.common import set_global_provider_object
 from prowler.providers.common.quick_inventory import run_provider_quick_inventory
 
@@ -273,6 +266,8 @@ def prowler():
             if provider == "aws" and (
                 args.output_bucket or args.output_bucket_no_assume
             ):
+                from prowler.providers.aws.lib.s3.s3 import send_to_s3_bucket
+
                 output_bucket = args.output_bucket
                 bucket_session = global_provider.session.current_session
                 # Check if -D was input
@@ -289,6 +284,13 @@ def prowler():
 
     # AWS Security Hub Integration
     if provider == "aws" and args.security_hub:
+        from prowler.providers.aws.lib.security_hub.security_hub import (
+            batch_send_to_security_hub,
+            prepare_security_hub_findings,
+            resolve_security_hub_previous_findings,
+            verify_security_hub_integration_enabled_per_region,
+        )
+
         print(
             f"{Style.BRIGHT}\nSending findings to AWS Security Hub, please wait...{Style.RESET_ALL}"
         )
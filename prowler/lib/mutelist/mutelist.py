@@ -1,15 +1,17 @@
 import re
 import sys
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import yaml
-from boto3 import Session
-from boto3.dynamodb.conditions import Attr
 from schema import Optional, Schema
 
 from prowler.lib.logger import logger
 from prowler.lib.outputs.utils import unroll_tags
 
+# boto3 is only imported when an AWS Mutelist is used, since it is slow to import and not needed by the other providers
+if TYPE_CHECKING:
+    from boto3 import Session
+
 mutelist_schema = Schema(
     {
         "Accounts": {
@@ -34,7 +36,7 @@ mutelist_schema = Schema(
 
 
 def parse_mutelist_file(
-    mutelist_path: str, aws_session: Session = None, aws_account: str = None
+    mutelist_path: str, aws_session: "Session" = None, aws_account: str = None
 ):
     try:
         # Check if file is a S3 URI
@@ -59,6 +61,8 @@ def parse_mutelist_file(
             r"^arn:aws(-cn|-us-gov)?:dynamodb:[a-z]{2}-[a-z-]+-[1-9]{1}:[0-9]{12}:table\/[a-zA-Z0-9._-]+$",
             mutelist_path,
         ):
+            from boto3.dynamodb.conditions import Attr
+
             mutelist = {"Accounts": {}}
             table_region = mutelist_path.split(":")[3]
             dynamodb_resource = aws_session.resource(
@@ -1,3 +1,5 @@
+from pydantic import BaseModel
+
 from prowler.config.config import timestamp_utc
 from prowler.lib.logger import logger
 from prowler.lib.outputs.compliance.compliance import get_check_compliance
@@ -135,3 +137,26 @@ def fill_json_asff(provider, finding):
         logger.error(
             f"{error.__class__.__name__}[{error.__traceback__.tb_lineno}]: {error}"
         )
+
+
+def json_asff_finding_to_dict(json_asff_finding):
+    """
+    Convert the finding's output in JSON ASFF format to a dict, skipping the None values.
+
+    It is equivalent to json_asff_finding.dict(exclude_none=True) but it reads the already validated values directly, avoiding the overhead of the Pydantic export for every finding.
+
+    Parameters:
+    - json_asff_finding: The Check_Output_JSON_ASFF object, or any of its values.
+
+    Returns:
+    - The finding in JSON ASFF format as a dict.
+    """
+    if isinstance(json_asff_finding, BaseModel):
+        return {
+            key: json_asff_finding_to_dict(value)
+            for key, value in json_asff_finding.__dict__.items()
+            if value is not None
+        }
+    if isinstance(json_asff_finding, list):
+        return [json_asff_finding_to_dict(value) for value in json_asff_finding]
+    return json_asff_finding
@@ -18,7 +18,10 @@ from prowler.lib.outputs.compliance.compliance import (
 )
 from prowler.lib.outputs.csv.csv import generate_csv_fields
 from prowler.lib.outputs.file_descriptors import fill_file_descriptors
-from prowler.lib.outputs.json_asff.json_asff import fill_json_asff
+from prowler.lib.outputs.json_asff.json_asff import (
+    fill_json_asff,
+    json_asff_finding_to_dict,
+)
 from prowler.lib.outputs.json_ocsf.json_ocsf import fill_json_ocsf
 from prowler.lib.outputs.utils import unroll_dict, unroll_list
 
@@ -109,12 +112,14 @@ def report(check_findings, provider):
                                 # Initialize this field using the class within fill_json_asff not here
                                 json_asff_finding = fill_json_asff(provider, finding)
 
-                                json.dump(
-                                    json_asff_finding.dict(exclude_none=True),
-                                    file_descriptors["json-asff"],
-                                    indent=4,
+                                # Encode the whole finding at once to write it with a single call
+                                file_descriptors["json-asff"].write(
+                                    json.dumps(
+                                        json_asff_finding_to_dict(json_asff_finding),
+                                        indent=4,
+                                    )
+                                    + ","
                                 )
-                                file_descriptors["json-asff"].write(",")
 
                         # Common Output Data
                         provider_data_mapping = get_provider_data_mapping(provider)
@@ -2,12 +2,15 @@ import os
 import pathlib
 import sys
 from argparse import Namespace
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable
 
 from boto3 import client, session
 from boto3.session import Session
 from botocore.config import Config
-from botocore.credentials import RefreshableCredentials
+from botocore.credentials import RefreshableCredentials, create_assume_role_refresher
 from botocore.session import get_session
 from colorama import Fore, Style
 from pytz import utc
@@ -25,6 +28,7 @@ from prowler.providers.aws.config import (
     AWS_STS_GLOBAL_ENDPOINT_REGION,
     BOTO3_USER_AGENT_EXTRA,
     ROLE_SESSION_NAME,
+    STS_CREDENTIALS_CACHE_EXPIRATION_MARGIN,
 )
 from prowler.providers.aws.lib.arn.arn import parse_iam_credentials_arn
 from prowler.providers.aws.lib.arn.models import ARN
@@ -46,6 +50,9 @@ from prowler.providers.aws.models import (
 from prowler.providers.common.models import Audit_Metadata
 from prowler.providers.common.provider import Provider
 
+# The credentials of the assumed IAM Roles are cached in memory until they are about to expire, e.g. to reuse them in warm AWS Lambda invocations
+_assumed_role_credentials_cache: dict = {}
+
 
 class AwsProvider(Provider):
     _type: str = "aws"
@@ -85,6 +92,9 @@ class AwsProvider(Provider):
         ######## AWS Session
         logger.info("Generating original session ...")
 
+        # AWS STS clients reused per session to assume IAM Roles
+        self._sts_clients = {}
+
         # Configure the initial AWS Session using the local credentials: profile or environment variables
         aws_session = self.setup_session(input_mfa, input_profile, input_role)
         session_config = self.set_session_config(aws_retries_max_attempts)
@@ -122,96 +132,89 @@ class AwsProvider(Provider):
         )
         ########
 
-        ######## AWS Session with Assume Role (if needed)
-        if input_role:
-            # Validate the input role
-            valid_role_arn = parse_iam_credentials_arn(input_role)
-            # Set assume IAM Role information
-            assumed_role_information = self.set_assumed_role_info(
-                valid_role_arn,
-                input_external_id,
-                input_mfa,
-                input_session_duration,
-                input_role_session_name,
-            )
-            # Assume the IAM Role
-            logger.info(f"Assuming role: {assumed_role_information.role_arn.arn}")
-            assumed_role_credentials = self.assume_role(
-                self._session.current_session,
-                assumed_role_information,
-            )
-            logger.info(f"IAM Role assumed: {assumed_role_information.role_arn.arn}")
-
-            assumed_role_configuration = AWSAssumeRoleConfiguration(
-                info=assumed_role_information, credentials=assumed_role_credentials
-            )
-            # Store the assumed role configuration since it'll be needed to refresh the credentials
-            self._assumed_role_configuration = assumed_role_configuration
-
-            # Store a new current session using the assumed IAM Role
-            self._session.current_session = self.setup_assumed_session(
-                assumed_role_configuration.credentials
-            )
-            logger.info("Audit session is the new session created assuming an IAM Role")
+        ######## AWS Organizations Metadata
+        # With both IAM Roles, the AWS Organizations IAM Role is assumed in parallel with the audited IAM Role
+        # The MFA token codes are asked in the terminal, so with MFA both are retrieved sequentially
+        organizations_metadata_arguments = (
+            organizations_role_arn,
+            (
+                parse_iam_credentials_arn(input_role).account_id
+                if input_role
+                else self._identity.account
+            ),
+            input_external_id,
+            input_mfa,
+            input_session_duration,
+            input_role_session_name,
+        )
+        organizations_metadata = None
+        with ThreadPoolExecutor(max_workers=1) as organizations_executor:
+            if organizations_role_arn and input_role and not input_mfa:
+                # boto3 Sessions are not thread safe, so the thread gets its own session with the original credentials
+                organizations_metadata = organizations_executor.submit(
+                    self.get_organizations_info_with_role,
+                    copy_session(
+                        self._session.original_session, self._identity.profile
+                    ),
+                    *organizations_metadata_arguments,
+                )
+            ########
+
+            ######## AWS Session with Assume Role (if needed)
+            if input_role:
+                # Validate the input role
+                valid_role_arn = parse_iam_credentials_arn(input_role)
+                # Set assume IAM Role information
+                assumed_role_information = self.set_assumed_role_info(
+                    valid_role_arn,
+                    input_external_id,
+                    input_mfa,
+                    input_session_duration,
+                    input_role_session_name,
+                )
+                # Assume the IAM Role
+                logger.info(f"Assuming role: {assumed_role_information.role_arn.arn}")
+                assumed_role_credentials = self.assume_role(
+                    self._session.current_session,
+                    assumed_role_information,
+                )
+                logger.info(
+                    f"IAM Role assumed: {assumed_role_information.role_arn.arn}"
+                )
 
-            # Modify identity for the IAM Role assumed since this will be the identity to audit with
-            logger.info("Setting new identity for the AWS IAM Role assumed")
-            self._identity.account = assumed_role_configuration.info.role_arn.account_id
-            self._identity.partition = (
-                assumed_role_configuration.info.role_arn.partition
-            )
-            self._identity.account_arn = f"arn:{assumed_role_configuration.info.role_arn.partition}:iam::{assumed_role_configuration.info.role_arn.account_id}:root"
-        ########
+                assumed_role_configuration = AWSAssumeRoleConfiguration(
+                    info=assumed_role_information, credentials=assumed_role_credentials
+                )
+                # Store the assumed role configuration of the audited IAM Role
+                self._assumed_role_configuration = assumed_role_configuration
 
-        ######## AWS Organizations Metadata
-        # This is needed in the case we don't assume an AWS Organizations IAM Role
-        aws_organizations_session = self._session.original_session
-        # Get a new session if the organizations_role_arn is set
-        if organizations_role_arn:
-            # Validate the input role
-            valid_role_arn = parse_iam_credentials_arn(organizations_role_arn)
-            # Set assume IAM Role information
-            organizations_assumed_role_information = self.set_assumed_role_info(
-                valid_role_arn,
-                input_external_id,
-                input_mfa,
-                input_session_duration,
-                input_role_session_name,
-            )
-            # Assume the Organizations IAM Role
-            logger.info(
-                f"Assuming the AWS Organizations IAM Role: {organizations_assumed_role_information.role_arn.arn}"
-            )
-            # Since here we can have _session.current_session with an IAM Role
-            # we'll use the _session.original_session
-            organizations_assumed_role_credentials = self.assume_role(
-                self._session.original_session,
-                organizations_assumed_role_information,
-            )
-            logger.info(
-                f"AWS Organizations IAM Role assumed: {organizations_assumed_role_information.role_arn.arn}"
-            )
-            organizations_assumed_role_configuration = AWSAssumeRoleConfiguration(
-                info=organizations_assumed_role_information,
-                credentials=organizations_assumed_role_credentials,
-            )
-            # Get a new session using the AWS Organizations IAM Role assumed
-            aws_organizations_session = self.setup_assumed_session(
-                organizations_assumed_role_configuration.credentials
-            )
-            logger.info(
-                "Generated new session for to get the AWS Organizations metadata"
-            )
+                # Store a new current session using the assumed IAM Role
+                self._session.current_session = self.setup_assumed_session(
+                    self._session.original_session, assumed_role_configuration
+                )
+                logger.info(
+                    "Audit session is the new session created assuming an IAM Role"
+                )
 
-            # TODO: Do we need to modify the identity here? I think not since it is not used
-            # self._identity.account = assumed_role.info.role_arn.account_id
-            # self._identity.partition = assumed_role.info.role_arn.partition
-            # self._identity.account_arn = f"arn:{self._identity.partition}:iam::{assumed_role.info.role_arn.account_id}:root"
+                # Modify identity for the IAM Role assumed since this will be the identity to audit with
+                logger.info("Setting new identity for the AWS IAM Role assumed")
+                self._identity.account = (
+                    assumed_role_configuration.info.role_arn.account_id
+                )
+                self._identity.partition = (
+                    assumed_role_configuration.info.role_arn.partition
+                )
+                self._identity.account_arn = f"arn:{assumed_role_configuration.info.role_arn.partition}:iam::{assumed_role_configuration.info.role_arn.account_id}:root"
+            ########
 
-        self._organizations_metadata = self.get_organizations_info(
-            aws_organizations_session, self._identity.account
-        )
-        ########
+            # Get the AWS Organizations metadata once the IAM Role is assumed
+            if organizations_metadata:
+                self._organizations_metadata = organizations_metadata.result()
+            else:
+                self._organizations_metadata = self.get_organizations_info_with_role(
+                    self._session.original_session,
+                    *organizations_metadata_arguments,
+                )
 
         # Parse Scan Tags
         if getattr(arguments, "resource_tags", None):
@@ -299,6 +302,61 @@ class AwsProvider(Provider):
             "partition": "identity.partition",
         }
 
+    def get_organizations_info_with_role(
+        self,
+        original_session: Session,
+        organizations_role_arn: str,
+        aws_account_id: str,
+        input_external_id: str,
+        input_mfa: bool,
+        input_session_duration: int,
+        input_role_session_name: str,
+    ) -> AWSOrganizationsInfo:
+        """
+        get_organizations_info_with_role returns the AWSOrganizationsInfo of the given account. If the organizations_role_arn (--organizations-role) is set, that IAM Role is assumed with the original_session to get it, otherwise the original_session is used directly.
+        """
+        # This is needed in the case we don't assume an AWS Organizations IAM Role
+        aws_organizations_session = original_session
+        # Get a new session if the organizations_role_arn is set
+        if organizations_role_arn:
+            # Validate the input role
+            valid_role_arn = parse_iam_credentials_arn(organizations_role_arn)
+            # Set assume IAM Role information
+            organizations_assumed_role_information = self.set_assumed_role_info(
+                valid_role_arn,
+                input_external_id,
+                input_mfa,
+                input_session_duration,
+                input_role_session_name,
+            )
+            # Assume the Organizations IAM Role
+            logger.info(
+                f"Assuming the AWS Organizations IAM Role: {organizations_assumed_role_information.role_arn.arn}"
+            )
+            # Since here we can have _session.current_session with an IAM Role
+            # we'll use the original_session
+            organizations_assumed_role_credentials = self.assume_role(
+                original_session,
+                organizations_assumed_role_information,
+            )
+            logger.info(
+                f"AWS Organizations IAM Role assumed: {organizations_assumed_role_information.role_arn.arn}"
+            )
+            organizations_assumed_role_configuration = AWSAssumeRoleConfiguration(
+                info=organizations_assumed_role_information,
+                credentials=organizations_assumed_role_credentials,
+            )
+            # Get a new session using the AWS Organizations IAM Role assumed
+            aws_organizations_session = self.setup_assumed_session(
+                original_session,
+                organizations_assumed_role_configuration,
+            )
+            logger.info(
+                "Generated new session for to get the AWS Organizations metadata"
+            )
+
+        return self.get_organizations_info(aws_organizations_session, aws_account_id)
+
     # TODO: This can be moved to another class since it doesn't need self
     def get_organizations_info(
         self, organizations_session: Session, aws_account_id: str
@@ -438,9 +496,14 @@ class AwsProvider(Provider):
 
     def setup_assumed_session(
         self,
-        assumed_role_credentials: AWSCredentials,
+        original_session: Session,
+        assumed_role_configuration: AWSAssumeRoleConfiguration,
     ) -> Session:
+        """
+        setup_assumed_session returns a new Session with the assumed IAM Role credentials, which are refreshed before they expire assuming the IAM Role again with the original_session
+        """
         try:
+            assumed_role_credentials = assumed_role_configuration.credentials
             # From botocore we can use RefreshableCredentials class, which has an attribute (refresh_using)
             # that needs to be a method without arguments that retrieves a new set of fresh credentials
             # asuming the role again. -> https://github.com/boto/botocore/blob/098cc255f81a25b852e1ecdeb7adebd94c7b1b73/botocore/credentials.py#L395
@@ -449,7 +512,9 @@ class AwsProvider(Provider):
                 secret_key=assumed_role_credentials.aws_secret_access_key,
                 token=assumed_role_credentials.aws_session_token,
                 expiry_time=assumed_role_credentials.expiration,
-                refresh_using=self.refresh_credentials,
+                refresh_using=self.get_credentials_refresher(
+                    original_session, assumed_role_configuration.info
+                ),
                 method="sts-assume-role",
             )
 
@@ -467,46 +532,48 @@ class AwsProvider(Provider):
             )
             sys.exit(1)
 
-    # TODO: maybe this can be improved with botocore.credentials.DeferredRefreshableCredentials https://stackoverflow.com/a/75576540
-    def refresh_credentials(self) -> dict:
+    def get_credentials_refresher(
+        self, session: Session, assumed_role_info: AWSAssumeRoleInfo
+    ) -> Callable[[], dict]:
         """
-        Refresh credentials method using AWS STS Assume Role.
+        get_credentials_refresher returns the method, without arguments, that botocore calls to refresh the assumed IAM Role credentials.
 
-        This method is called adding "()" to the name, so it cannot accept arguments
-        https://github.com/boto/botocore/blob/098cc255f81a25b852e1ecdeb7adebd94c7b1b73/botocore/credentials.py#L570
+        It is the botocore assume role refresher, unless MFA is enabled: the MFA token code can only be used once so it has to be asked again assuming the role.
         """
-        logger.info("Refreshing assumed credentials...")
-
-        # Since this method does not accept arguments, we need to get the original_session and the assumed role credentials
-        current_credentials = self._assumed_role_configuration.credentials
-        refreshed_credentials = {
-            "access_key": current_credentials.aws_access_key_id,
-            "secret_key": current_credentials.aws_secret_access_key,
-            "token": current_credentials.aws_session_token,
-            "expiry_time": (
-                current_credentials.expiration.isoformat()
-                if hasattr(current_credentials, "expiration")
-                else current_credentials.expiry_time.isoformat()
-            ),
-        }
+        if assumed_role_info.mfa_enabled:
 
-        if datetime.fromisoformat(refreshed_credentials["expiry_time"]) <= datetime.now(
-            get_localzone()
-        ):
-            assume_role_response = self.assume_role(
-                self._session.original_session, self._assumed_role_configuration.info
-            )
-            refreshed_credentials = dict(
-                # Keys of the dict has to be the same as those that are being searched in the parent class
+            def refresh_credentials() -> dict:
+                logger.info("Refreshing assumed credentials...")
+                assumed_role_credentials = self.assume_role(session, assumed_role_info)
+                # Keys of the dict has to be the same as those that are being searched in RefreshableCredentials
                 # https://github.com/boto/botocore/blob/098cc255f81a25b852e1ecdeb7adebd94c7b1b73/botocore/credentials.py#L609
-                access_key=assume_role_response.aws_access_key_id,
-                secret_key=assume_role_response.aws_secret_access_key,
-                token=assume_role_response.aws_session_token,
-                expiry_time=assume_role_response.expiration.isoformat(),
-            )
-            logger.info(f"Refreshed Credentials: {refreshed_credentials}")
+                return {
+                    "access_key": assumed_role_credentials.aws_access_key_id,
+                    "secret_key": assumed_role_credentials.aws_secret_access_key,
+                    "token": assumed_role_credentials.aws_session_token,
+                    "expiry_time": assumed_role_credentials.expiration.isoformat(),
+                }
 
-        return refreshed_credentials
+            return refresh_credentials
+
+        return create_assume_role_refresher(
+            self.get_sts_client(session),
+            self.get_assume_role_arguments(assumed_role_info),
+        )
+
+    def get_sts_client(self, session: Session):
+        """
+        get_sts_client returns the AWS STS client of the global endpoint region for the given session, which is only created the first time
+        """
+        # The session is stored with its client so its id() cannot be reused by another session
+        if id(session) not in self._sts_clients:
+            # The AWS Organizations IAM Role can be assumed from another thread, so the client is inserted with setdefault
+            # If both threads create it at the same time, both get the first one inserted and the other is discarded
+            self._sts_clients.setdefault(
+                id(session),
+                (session, create_sts_session(session, AWS_STS_GLOBAL_ENDPOINT_REGION)),
+            )
+        return self._sts_clients[id(session)][1]
 
     def print_credentials(self):
         # Beautify audited regions, set "all" if there is no filter region
@@ -596,8 +663,9 @@ class AwsProvider(Provider):
             service_list = set()
             sub_service_list = set()
             for resource in self._audit_resources:
-                service = resource.split(":")[2]
-                sub_service = resource.split(":")[5].split("/")[0].replace("-", "_")
+                resource_elements = resource.split(":")
+                service = resource_elements[2]
+                sub_service = resource_elements[5].split("/")[0].replace("-", "_")
                 # WAF Services does not have checks
                 if service != "wafv2" and service != "waf":
                     # Parse services when they are different in the ARNs
@@ -763,6 +831,28 @@ class AwsProvider(Provider):
 
         return default_session_config
 
+    def get_assume_role_arguments(self, assumed_role_info: AWSAssumeRoleInfo) -> dict:
+        """
+        get_assume_role_arguments returns the sts:AssumeRole arguments, without the MFA ones, for the given AWSAssumeRoleInfo
+        """
+        role_session_name = (
+            assumed_role_info.role_session_name
+            if assumed_role_info.role_session_name
+            else ROLE_SESSION_NAME
+        )
+
+        assume_role_arguments = {
+            "RoleArn": assumed_role_info.role_arn.arn,
+            "RoleSessionName": role_session_name,
+            "DurationSeconds": assumed_role_info.session_duration,
+        }
+
+        # Set the info to assume the IAM Role from the partition, account and role name
+        if assumed_role_info.external_id:
+            assume_role_arguments["ExternalId"] = assumed_role_info.external_id
+
+        return assume_role_arguments
+
     def assume_role(
         self,
         session: Session,
@@ -774,28 +864,31 @@ class AwsProvider(Provider):
         assume_role assumes the IAM roles passed with the given session and returns AWSCredentials
         """
         try:
-            role_session_name = (
-                assumed_role_info.role_session_name
-                if assumed_role_info.role_session_name
-                else ROLE_SESSION_NAME
+            assume_role_arguments = self.get_assume_role_arguments(assumed_role_info)
+
+            # Reuse the credentials of the IAM Role if it was already assumed with the same arguments and they are not about to expire
+            cache_key = (
+                get_session_access_key(session),
+                assume_role_arguments["RoleArn"],
+                assume_role_arguments["RoleSessionName"],
+                assume_role_arguments["DurationSeconds"],
+                assume_role_arguments.get("ExternalId"),
             )
-
-            assume_role_arguments = {
-                "RoleArn": assumed_role_info.role_arn.arn,
-                "RoleSessionName": role_session_name,
-                "DurationSeconds": assumed_role_info.session_duration,
-            }
-
-            # Set the info to assume the IAM Role from the partition, account and role name
-            if assumed_role_info.external_id:
-                assume_role_arguments["ExternalId"] = assumed_role_info.external_id
+            cached_credentials = _assumed_role_credentials_cache.get(cache_key)
+            if cached_credentials and cached_credentials.expiration - timedelta(
+                seconds=STS_CREDENTIALS_CACHE_EXPIRATION_MARGIN
+            ) > datetime.now(get_localzone()):
+                logger.info(
+                    f"Using the cached credentials of the IAM Role {assume_role_arguments['RoleArn']}"
+                )
+                return cached_credentials
 
             if assumed_role_info.mfa_enabled:
                 mfa_info = self.__input_role_mfa_token_and_code__()
                 assume_role_arguments["SerialNumber"] = mfa_info.arn
                 assume_role_arguments["TokenCode"] = mfa_info.totp
 
-            sts_client = create_sts_session(session, AWS_STS_GLOBAL_ENDPOINT_REGION)
+            sts_client = self.get_sts_client(session)
             assumed_credentials = sts_client.assume_role(**assume_role_arguments)
             # Convert the UTC datetime object to your local timezone
             credentials_expiration_local_time = (
@@ -804,7 +897,7 @@ class AwsProvider(Provider):
                 .astimezone(get_localzone())
             )
 
-            return AWSCredentials(
+            assumed_role_credentials = AWSCredentials(
                 aws_access_key_id=assumed_credentials["Credentials"]["AccessKeyId"],
                 aws_session_token=assumed_credentials["Credentials"]["SessionToken"],
                 aws_secret_access_key=assumed_credentials["Credentials"][
@@ -812,6 +905,9 @@ class AwsProvider(Provider):
                 ],
                 expiration=credentials_expiration_local_time,
             )
+            _assumed_role_credentials_cache[cache_key] = assumed_role_credentials
+
+            return assumed_role_credentials
         except Exception as error:
             logger.critical(
                 f"{error.__class__.__name__}[{error.__traceback__.tb_lineno}] -- {error}"
@@ -860,10 +956,14 @@ class AwsProvider(Provider):
             sys.exit(1)
 
 
+@lru_cache(maxsize=1)
 def read_aws_regions_file() -> dict:
     """
     Reads the AWS services JSON file and returns the parsed data as a dictionary.
 
+    The file is parsed only once per execution since it is read every time a service generates its regional clients.
+    The returned dictionary is shared between callers, so it must not be modified.
+
     Returns:
         dict: The parsed data from the AWS services JSON file.
     """
@@ -922,6 +1022,25 @@ def validate_aws_credentials(
         sys.exit(1)
 
 
+def get_session_access_key(session: Session) -> str:
+    """get_session_access_key returns the AWS access key ID of the given session credentials or None if there are no credentials"""
+    credentials = session.get_credentials()
+    return credentials.access_key if credentials else None
+
+
+def copy_session(original_session: Session, profile: str = None) -> Session:
+    """
+    copy_session returns a new Session with the credentials and region of the original_session and the configuration of the given profile, to be used from another thread since boto3 Sessions are not thread safe
+
+    The profile is the input one instead of original_session.profile_name, which is "default" when no profile is passed and that profile may not exist
+    """
+    botocore_session = get_session()
+    botocore_session._credentials = original_session.get_credentials()
+    if original_session.region_name:
+        botocore_session.set_config_variable("region", original_session.region_name)
+    return session.Session(profile_name=profile, botocore_session=botocore_session)
+
+
 # TODO: This can be moved to another class since it doesn't need self
 def get_aws_region_for_sts(session_region: str, input_regions: set[str]) -> str:
     # If there is no region passed with -f/--region/--filter-region
@@ -1,3 +1,5 @@
 AWS_STS_GLOBAL_ENDPOINT_REGION = "us-east-1"
 BOTO3_USER_AGENT_EXTRA = "APN_1826889"
 ROLE_SESSION_NAME = "ProwlerAssessmentSession"
+# Cached AWS STS credentials are not reused if they expire within this number of seconds, the botocore advisory refresh timeout
+STS_CREDENTIALS_CACHE_EXPIRATION_MARGIN = 15 * 60
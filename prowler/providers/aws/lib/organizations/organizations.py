@@ -29,10 +29,10 @@ def get_organizations_metadata(
 
 def parse_organizations_metadata(metadata: dict, tags: dict) -> AWSOrganizationsInfo:
     try:
-        # Convert Tags dictionary to String
-        account_details_tags = []
-        for tag in tags.get("Tags", {}):
-            account_details_tags.append(f"{tag['Key']}:{tag['Value']}")
+        # Convert Tags dictionary to a list of "key:value" strings
+        account_details_tags = [
+            f"{tag['Key']}:{tag['Value']}" for tag in tags.get("Tags", [])
+        ]
 
         account_details = metadata.get("Account", {})
 
@@ -1,12 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from weakref import WeakKeyDictionary
+
 from boto3 import session
 from botocore.client import ClientError
 
 from prowler.config.config import timestamp_utc
 from prowler.lib.logger import logger
-from prowler.lib.outputs.json_asff.json_asff import fill_json_asff
+from prowler.lib.outputs.json_asff.json_asff import (
+    fill_json_asff,
+    json_asff_finding_to_dict,
+)
 
 SECURITY_HUB_INTEGRATION_NAME = "prowler/prowler"
 SECURITY_HUB_MAX_BATCH = 100
+SECURITY_HUB_MAX_WORKERS = 32
+
+# Security Hub clients are reused per session and region while the session is in use
+# The sessions are weak keys, so they and their clients are released once they are not used anymore
+_security_hub_clients: WeakKeyDictionary = WeakKeyDictionary()
 
 
 def prepare_security_hub_findings(
@@ -47,7 +59,7 @@ def prepare_security_hub_findings(
 
         # Include that finding within their region in the JSON format
         security_hub_findings_per_region[region].append(
-            finding_json_asff.dict(exclude_none=True)
+            json_asff_finding_to_dict(finding_json_asff)
         )
 
     return security_hub_findings_per_region
@@ -67,7 +79,7 @@ def verify_security_hub_integration_enabled_per_region(
             f"Checking if the {SECURITY_HUB_INTEGRATION_NAME} is enabled in the {region} region."
         )
         # Check if security hub is enabled in current region
-        security_hub_client = session.client("securityhub", region_name=region)
+        security_hub_client = __get_security_hub_client__(session, region)
         security_hub_client.describe_hub()
 
         # Check if Prowler integration is enabled in Security Hub
@@ -119,12 +131,16 @@ def batch_send_to_security_hub(
     try:
         # Iterate findings by region
         for region, findings in security_hub_findings_per_region.items():
+            # Skip the regions without findings to not create their client
+            if not findings:
+                continue
+
             # Send findings to Security Hub
             logger.info(f"Sending findings to Security Hub in the region {region}")
 
-            security_hub_client = session.client("securityhub", region_name=region)
+            security_hub_client = __get_security_hub_client__(session, region)
 
-            success_count = __send_findings_to_security_hub__(
+            success_count += __send_findings_to_security_hub__(
                 findings, region, security_hub_client
             )
 
@@ -144,47 +160,83 @@ def resolve_security_hub_previous_findings(
     """
     logger.info("Checking previous findings in Security Hub to archive them.")
     success_count = 0
-    for region in security_hub_findings_per_region.keys():
-        try:
-            current_findings = security_hub_findings_per_region[region]
-            # Get current findings IDs
-            current_findings_ids = []
-            for finding in current_findings:
-                current_findings_ids.append(finding["Id"])
-            # Get findings of that region
-            security_hub_client = provider.session.current_session.client(
-                "securityhub", region_name=region
-            )
-            findings_filter = {
-                "ProductName": [{"Value": "Prowler", "Comparison": "EQUALS"}],
-                "RecordState": [{"Value": "ACTIVE", "Comparison": "EQUALS"}],
-                "AwsAccountId": [
-                    {"Value": provider.identity.account, "Comparison": "EQUALS"}
-                ],
-                "Region": [{"Value": region, "Comparison": "EQUALS"}],
-            }
-            get_findings_paginator = security_hub_client.get_paginator("get_findings")
-            findings_to_archive = []
-            for page in get_findings_paginator.paginate(Filters=findings_filter):
-                # Archive findings that have not appear in this execution
-                for finding in page["Findings"]:
-                    if finding["Id"] not in current_findings_ids:
-                        finding["RecordState"] = "ARCHIVED"
-                        finding["UpdatedAt"] = timestamp_utc.strftime(
-                            "%Y-%m-%dT%H:%M:%SZ"
-                        )
-
-                        findings_to_archive.append(finding)
-            logger.info(f"Archiving {len(findings_to_archive)} findings.")
-
-            # Send archive findings to SHub
-            success_count += __send_findings_to_security_hub__(
-                findings_to_archive, region, security_hub_client
-            )
-        except Exception as error:
-            logger.error(
-                f"{error.__class__.__name__} -- [{error.__traceback__.tb_lineno}]:{error} in region {region}"
-            )
+    if not security_hub_findings_per_region:
+        return success_count
+
+    # Only the Region changes between the regions, so the rest of the filter is built once
+    base_findings_filter = {
+        "ProductName": [{"Value": "Prowler", "Comparison": "EQUALS"}],
+        "RecordState": [{"Value": "ACTIVE", "Comparison": "EQUALS"}],
+        "AwsAccountId": [{"Value": provider.identity.account, "Comparison": "EQUALS"}],
+    }
+
+    # Each region is archived in its own thread, so the wall time is bound by the slowest region
+    with ThreadPoolExecutor(
+        max_workers=min(SECURITY_HUB_MAX_WORKERS, len(security_hub_findings_per_region))
+    ) as executor:
+        futures = []
+        for region, current_findings in security_hub_findings_per_region.items():
+            try:
+                # boto3 sessions are not thread safe, so the client is created here and only the API calls run in the thread
+                security_hub_client = __get_security_hub_client__(
+                    provider.session.current_session, region
+                )
+                futures.append(
+                    executor.submit(
+                        __archive_previous_findings_per_region__,
+                        region,
+                        {finding["Id"] for finding in current_findings},
+                        security_hub_client,
+                        base_findings_filter,
+                    )
+                )
+            except Exception as error:
+                logger.error(
+                    f"{error.__class__.__name__} -- [{error.__traceback__.tb_lineno}]:{error} in region {region}"
+                )
+
+        for future in as_completed(futures):
+            success_count += future.result()
+
+    return success_count
+
+
+def __archive_previous_findings_per_region__(
+    region: str,
+    current_findings_ids: set,
+    security_hub_client,
+    base_findings_filter: dict,
+) -> int:
+    """Private function archive_previous_findings_per_region archives the Prowler findings of the given region that are not present in the current execution. It returns the number of archived findings."""
+    success_count = 0
+    try:
+        # Get findings of that region
+        findings_filter = {
+            **base_findings_filter,
+            "Region": [{"Value": region, "Comparison": "EQUALS"}],
+        }
+        findings_to_archive = []
+        get_findings_paginator = security_hub_client.get_paginator("get_findings")
+        for page in get_findings_paginator.paginate(Filters=findings_filter):
+            # Archive findings that have not appear in this execution
+            for finding in page["Findings"]:
+                if finding["Id"] not in current_findings_ids:
+                    finding["RecordState"] = "ARCHIVED"
+                    finding["UpdatedAt"] = timestamp_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+                    findings_to_archive.append(finding)
+        logger.info(
+            f"Archiving {len(findings_to_archive)} findings in region {region}."
+        )
+
+        # Send archive findings to SHub
+        success_count = __send_findings_to_security_hub__(
+            findings_to_archive, region, security_hub_client
+        )
+    except Exception as error:
+        logger.error(
+            f"{error.__class__.__name__} -- [{error.__traceback__.tb_lineno}]:{error} in region {region}"
+        )
     return success_count
 
 
@@ -194,12 +246,7 @@ def __send_findings_to_security_hub__(
     """Private function send_findings_to_security_hub chunks the findings in groups of 100 findings and send them to AWS Security Hub. It returns the number of sent findings."""
     success_count = 0
     try:
-        list_chunked = [
-            findings[i : i + SECURITY_HUB_MAX_BATCH]
-            for i in range(0, len(findings), SECURITY_HUB_MAX_BATCH)
-        ]
-
-        for findings in list_chunked:
+        for findings in __chunk_findings__(findings, SECURITY_HUB_MAX_BATCH):
             batch_import = security_hub_client.batch_import_findings(Findings=findings)
             if batch_import["FailedCount"] > 0:
                 failed_import = batch_import["FailedFindings"][0]
@@ -214,3 +261,18 @@ def __send_findings_to_security_hub__(
         )
     finally:
         return success_count
+
+
+def __chunk_findings__(findings: list[dict], chunk_size: int):
+    """Private function chunk_findings yields the findings in groups of chunk_size findings, creating each group only when it is needed."""
+    findings_iterator = iter(findings)
+    while chunk := list(islice(findings_iterator, chunk_size)):
+        yield chunk
+
+
+def __get_security_hub_client__(session: session.Session, region: str):
+    """Private function get_security_hub_client returns the Security Hub client for the given session and region, creating it only the first time."""
+    session_clients = _security_hub_clients.setdefault(session, {})
+    if region not in session_clients:
+        session_clients[region] = session.client("securityhub", region_name=region)
+    return session_clients[region]
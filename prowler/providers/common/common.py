@@ -1,13 +1,16 @@
 import importlib
 import pkgutil
 import sys
+from contextvars import ContextVar
 from importlib import import_module
 
 from prowler.lib.logger import logger
 
 providers_path = "prowler.providers"
 
-global_provider = None
+# The provider of the current context, e.g. a copy created with contextvars.copy_context().run()
+# The check clients are still built once per process, with the provider set when they are imported
+_global_provider: ContextVar = ContextVar("global_provider", default=None)
 
 
 def get_available_providers() -> list[str]:
@@ -23,14 +26,16 @@ def get_available_providers() -> list[str]:
 
 
 def get_global_provider():
-    return global_provider
+    return _global_provider.get()
+
+
+def set_global_provider(provider):
+    """set_global_provider sets the given provider as the provider of the current context"""
+    _global_provider.set(provider)
 
 
-# TODO: rename to set_global_provider
 def set_global_provider_object(arguments):
     try:
-        global global_provider
-
         provider_class_path = (
             f"{providers_path}.{arguments.provider}.{arguments.provider}_provider"
         )
@@ -38,10 +43,13 @@ def set_global_provider_object(arguments):
         provider_class = getattr(
             import_module(provider_class_path), provider_class_name
         )
-        if not isinstance(global_provider, provider_class):
-            global_provider = provider_class(arguments)
+        # The callers use the returned provider, the global one is only kept for the services
+        provider = get_global_provider()
+        if not isinstance(provider, provider_class):
+            provider = provider_class(arguments)
+            set_global_provider(provider)
 
-        return global_provider
+        return provider
     except TypeError as error:
         logger.critical(
             f"{error.__class__.__name__}[{error.__traceback__.tb_lineno}]: {error}"
@@ -2,7 +2,6 @@ import importlib
 import sys
 
 from prowler.lib.logger import logger
-from prowler.providers.aws.lib.quick_inventory.quick_inventory import quick_inventory
 
 
 def run_provider_quick_inventory(provider, args):
@@ -23,4 +22,8 @@ def run_provider_quick_inventory(provider, args):
 
 
 def aws_quick_inventory(provider, args):
+    from prowler.providers.aws.lib.quick_inventory.quick_inventory import (
+        quick_inventory,
+    )
+
     quick_inventory(provider, args)
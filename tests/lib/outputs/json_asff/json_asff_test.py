@@ -8,6 +8,7 @@ from prowler.lib.outputs.json_asff.json_asff import (
     fill_json_asff,
     generate_json_asff_resource_tags,
     generate_json_asff_status,
+    json_asff_finding_to_dict,
 )
 from prowler.lib.outputs.json_asff.models import (
     Check_Output_JSON_ASFF,
@@ -470,3 +471,35 @@ class TestOutputJSONASFF:
         assert generate_json_asff_resource_tags(
             [{"Key": "key1", "Value": "value1"}]
         ) == {"key1": "value1"}
+
+    def test_json_asff_finding_to_dict(self):
+        aws_provider = set_mocked_aws_provider()
+        finding = Check_Report(load_check_metadata(METADATA_FIXTURE_PATH).json())
+        finding.resource_details = "Test resource details"
+        finding.resource_id = "test-resource"
+        finding.resource_arn = "test-arn"
+        finding.region = "eu-west-1"
+        finding.status = "FAIL"
+        finding.status_extended = "This is a test"
+        finding.resource_tags = [{"Key": "key1", "Value": "value1"}]
+
+        json_asff_finding = fill_json_asff(aws_provider, finding)
+
+        assert json_asff_finding_to_dict(json_asff_finding) == json_asff_finding.dict(
+            exclude_none=True
+        )
+
+    def test_json_asff_finding_to_dict_without_tags(self):
+        aws_provider = set_mocked_aws_provider()
+        finding = Check_Report(load_check_metadata(METADATA_FIXTURE_PATH).json())
+        finding.resource_id = "test-resource"
+        finding.resource_arn = "test-arn"
+        finding.region = "eu-west-1"
+        finding.status = "PASS"
+        finding.status_extended = "This is a test"
+
+        json_asff_finding = fill_json_asff(aws_provider, finding)
+        json_asff_dict = json_asff_finding_to_dict(json_asff_finding)
+
+        assert "Tags" not in json_asff_dict["Resources"][0]
+        assert json_asff_dict == json_asff_finding.dict(exclude_none=True)
@@ -3,29 +3,37 @@ import os
 import re
 import tempfile
 from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from json import dumps
 from os import rmdir
 from re import search
+from threading import current_thread, main_thread
+from time import sleep
 
 import botocore
 from boto3 import client, session
+from dateutil.parser import parse as parse_datetime
 from freezegun import freeze_time
 from mock import patch
 from moto import mock_aws
+from pytest import raises
 from tzlocal import get_localzone
 
 from prowler.providers.aws.aws_provider import (
     AwsProvider,
+    copy_session,
     create_sts_session,
     get_aws_available_regions,
     get_aws_region_for_sts,
+    read_aws_regions_file,
     validate_aws_credentials,
 )
 from prowler.providers.aws.config import (
     AWS_STS_GLOBAL_ENDPOINT_REGION,
     BOTO3_USER_AGENT_EXTRA,
 )
+from prowler.providers.aws.lib.arn.error import RoleArnParsingInvalidResourceType
 from prowler.providers.aws.lib.arn.models import ARN
 from prowler.providers.aws.models import (
     AWSAssumeRoleInfo,
@@ -358,6 +366,74 @@ class TestAWSProvider:
             aws_provider.organizations_metadata.organization_arn == organization["Arn"]
         )
 
+    @mock_aws
+    def test_aws_provider_organizations_with_role_and_assume_role(self):
+        organizations_role_arn = create_role(AWS_REGION_EU_WEST_1)
+        organizations_client = client("organizations", region_name=AWS_REGION_EU_WEST_1)
+        organization = organizations_client.create_organization()["Organization"]
+
+        arguments = Namespace()
+        arguments.role = f"arn:aws:iam::{AWS_ACCOUNT_NUMBER}:role/test-role"
+        arguments.organizations_role = organizations_role_arn
+        arguments.session_duration = 900
+
+        organizations_calls = []
+        get_organizations_info_with_role = AwsProvider.get_organizations_info_with_role
+
+        def spy_get_organizations_info_with_role(self, original_session, *args):
+            organizations_calls.append((current_thread(), original_session))
+            return get_organizations_info_with_role(self, original_session, *args)
+
+        with patch.object(
+            AwsProvider,
+            "get_organizations_info_with_role",
+            new=spy_get_organizations_info_with_role,
+        ):
+            aws_provider = AwsProvider(arguments)
+
+        # The AWS Organizations IAM Role is assumed in another thread with its own session
+        assert len(organizations_calls) == 1
+        organizations_thread, organizations_session = organizations_calls[0]
+        assert organizations_thread is not main_thread()
+        assert organizations_session is not aws_provider.session.original_session
+        assert (
+            organizations_session.get_credentials()
+            is aws_provider.session.original_session.get_credentials()
+        )
+        assert isinstance(aws_provider.organizations_metadata, AWSOrganizationsInfo)
+        assert aws_provider.organizations_metadata.organization_id == organization["Id"]
+        assert aws_provider.identity.account == AWS_ACCOUNT_NUMBER
+
+    @mock_aws
+    def test_aws_provider_organizations_with_role_without_assume_role(self):
+        organizations_role_arn = create_role(AWS_REGION_EU_WEST_1)
+        organizations_client = client("organizations", region_name=AWS_REGION_EU_WEST_1)
+        organization = organizations_client.create_organization()["Organization"]
+
+        arguments = Namespace()
+        arguments.organizations_role = organizations_role_arn
+        arguments.session_duration = 900
+
+        organizations_calls = []
+        get_organizations_info_with_role = AwsProvider.get_organizations_info_with_role
+
+        def spy_get_organizations_info_with_role(self, original_session, *args):
+            organizations_calls.append((current_thread(), original_session))
+            return get_organizations_info_with_role(self, original_session, *args)
+
+        with patch.object(
+            AwsProvider,
+            "get_organizations_info_with_role",
+            new=spy_get_organizations_info_with_role,
+        ):
+            aws_provider = AwsProvider(arguments)
+
+        # There is nothing to do in parallel, so the original session is used in the main thread
+        assert organizations_calls == [
+            (main_thread(), aws_provider.session.original_session)
+        ]
+        assert aws_provider.organizations_metadata.organization_id == organization["Id"]
+
     @mock_aws
     def test_aws_provider_session_with_mfa(self):
         arguments = Namespace()
@@ -697,7 +773,7 @@ aws:
         aws_provider = AwsProvider(arguments)
 
         with patch(
-            "prowler.providers.aws.aws_provider.parse_json_file",
+            "prowler.providers.aws.aws_provider.read_aws_regions_file",
             return_value={
                 "services": {
                     "ec2": {
@@ -736,7 +812,7 @@ aws:
         aws_provider = AwsProvider(arguments)
 
         with patch(
-            "prowler.providers.aws.aws_provider.parse_json_file",
+            "prowler.providers.aws.aws_provider.read_aws_regions_file",
             return_value={
                 "services": {
                     "ec2": {
@@ -1021,6 +1097,152 @@ aws:
         assert get_caller_identity.arn.resource == "test-user"
         assert get_caller_identity.arn.resource_type == "user"
 
+    @mock_aws
+    def test_assume_role_cached(self):
+        role_arn = create_role(AWS_REGION_EU_WEST_1)
+        aws_provider = AwsProvider(Namespace())
+        assumed_role_info = aws_provider.set_assumed_role_info(
+            ARN(role_arn), None, False, 3600, None
+        )
+
+        with patch(
+            "prowler.providers.aws.aws_provider.create_sts_session",
+            wraps=create_sts_session,
+        ) as sts_session:
+            credentials = aws_provider.assume_role(
+                aws_provider.session.original_session, assumed_role_info
+            )
+            assert (
+                aws_provider.assume_role(
+                    aws_provider.session.original_session, assumed_role_info
+                )
+                == credentials
+            )
+            sts_session.assert_called_once()
+
+    @mock_aws
+    def test_get_sts_client_reused(self):
+        aws_provider = AwsProvider(Namespace())
+        original_session = aws_provider.session.original_session
+
+        sts_client = aws_provider.get_sts_client(original_session)
+        assert aws_provider.get_sts_client(original_session) is sts_client
+        assert sts_client.meta.region_name == AWS_STS_GLOBAL_ENDPOINT_REGION
+        assert (
+            aws_provider.get_sts_client(
+                session.Session(region_name=AWS_REGION_EU_WEST_1)
+            )
+            is not sts_client
+        )
+
+    @mock_aws
+    def test_get_sts_client_from_several_threads(self):
+        aws_provider = AwsProvider(Namespace())
+        original_session = aws_provider.session.original_session
+
+        def slow_create_sts_session(*_):
+            sleep(0.1)
+            return object()
+
+        with patch(
+            "prowler.providers.aws.aws_provider.create_sts_session",
+            side_effect=slow_create_sts_session,
+        ) as sts_session:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                sts_clients = list(
+                    executor.map(
+                        lambda _: aws_provider.get_sts_client(original_session),
+                        range(4),
+                    )
+                )
+
+        # The clients are created outside of any lock, but all the threads get the same one
+        assert sts_session.call_count >= 1
+        assert all(sts_client is sts_clients[0] for sts_client in sts_clients)
+        assert aws_provider.get_sts_client(original_session) is sts_clients[0]
+
+    @mock_aws
+    def test_assume_role_cached_about_to_expire(self):
+        role_arn = create_role(AWS_REGION_EU_WEST_1)
+        aws_provider = AwsProvider(Namespace())
+        # Credentials of the minimum session duration are always within the expiration margin
+        assumed_role_info = aws_provider.set_assumed_role_info(
+            ARN(role_arn), None, False, 900, None
+        )
+
+        credentials = aws_provider.assume_role(
+            aws_provider.session.original_session, assumed_role_info
+        )
+        assert (
+            aws_provider.assume_role(
+                aws_provider.session.original_session, assumed_role_info
+            ).aws_access_key_id
+            != credentials.aws_access_key_id
+        )
+
+    @mock_aws
+    def test_set_identity(self):
+        aws_provider = AwsProvider(Namespace())
+        caller_identity = AWSCallerIdentity(
+            user_id="XXXXXXXXXXXXXXXXXXXXX",
+            account=AWS_ACCOUNT_NUMBER,
+            arn=ARN(f"arn:aws:iam::{AWS_ACCOUNT_NUMBER}:user/test-user"),
+            region=AWS_REGION_US_EAST_1,
+        )
+
+        identity = aws_provider.set_identity(
+            caller_identity, None, None, AWS_REGION_US_EAST_1
+        )
+
+        assert identity.partition == AWS_COMMERCIAL_PARTITION
+        assert identity.account_arn == AWS_ACCOUNT_ARN
+        assert identity.identity_arn == caller_identity.arn.arn
+
+    @mock_aws
+    def test_set_identity_root_caller_identity(self):
+        aws_provider = AwsProvider(Namespace())
+        # The caller identity ARN is validated as an IAM credentials ARN
+        caller_identity = AWSCallerIdentity(
+            user_id=AWS_ACCOUNT_NUMBER,
+            account=AWS_ACCOUNT_NUMBER,
+            arn=ARN(f"arn:aws:iam::{AWS_ACCOUNT_NUMBER}:root"),
+            region=AWS_REGION_US_EAST_1,
+        )
+
+        with raises(RoleArnParsingInvalidResourceType):
+            aws_provider.set_identity(caller_identity, None, None, AWS_REGION_US_EAST_1)
+
+    @mock_aws
+    def test_copy_session(self):
+        config_file = tempfile.NamedTemporaryFile(mode="w", delete=False)
+        config_file.write("[profile test]\nregion = eu-west-1\nmax_attempts = 7\n")
+        config_file.close()
+
+        with patch.dict(os.environ, {"AWS_CONFIG_FILE": config_file.name}):
+            original_session = session.Session(
+                profile_name="test", region_name=AWS_REGION_US_EAST_1
+            )
+            copied_session = copy_session(original_session, "test")
+
+            assert copied_session is not original_session
+            assert (
+                copied_session.get_credentials() is original_session.get_credentials()
+            )
+            assert copied_session.region_name == AWS_REGION_US_EAST_1
+            assert copied_session.profile_name == "test"
+            # The profile configuration is kept
+            assert copied_session._session.get_scoped_config()["max_attempts"] == "7"
+        os.remove(config_file.name)
+
+    @mock_aws
+    def test_copy_session_without_profile(self):
+        original_session = session.Session(region_name=AWS_REGION_EU_WEST_1)
+
+        copied_session = copy_session(original_session)
+
+        assert copied_session.get_credentials() is original_session.get_credentials()
+        assert copied_session.region_name == AWS_REGION_EU_WEST_1
+
     @mock_aws
     def test_create_sts_session(self):
         current_session = session.Session()
@@ -1313,6 +1535,15 @@ aws:
                 "us-gov-west-1",
             }
 
+    def test_read_aws_regions_file_is_parsed_once(self):
+        with patch(
+            "prowler.providers.aws.aws_provider.parse_json_file",
+            return_value={"services": {}},
+        ) as parse_json_file:
+            assert read_aws_regions_file() == {"services": {}}
+            assert read_aws_regions_file() == {"services": {}}
+            parse_json_file.assert_called_once()
+
     def test_get_aws_region_for_sts_input_regions_none_session_region_none(self):
         input_regions = None
         session_region = None
@@ -1387,29 +1618,7 @@ aws:
         }
 
     @mock_aws
-    def test_refresh_credentials_before_expiration(self):
-        role_arn = create_role(AWS_REGION_EU_WEST_1)
-        arguments = Namespace()
-        arguments.role = role_arn
-        arguments.session_duration = 900
-        aws_provider = AwsProvider(arguments)
-
-        current_credentials = (
-            aws_provider._assumed_role_configuration.credentials.__dict__
-        )
-        refreshed_credentials = {
-            "access_key": current_credentials["aws_access_key_id"],
-            "secret_key": current_credentials["aws_secret_access_key"],
-            "token": current_credentials["aws_session_token"],
-            "expiry_time": current_credentials.get(
-                "expiration", current_credentials.get("expiry_time")
-            ).isoformat(),
-        }
-
-        assert aws_provider.refresh_credentials() == refreshed_credentials
-
-    @mock_aws
-    def test_refresh_credentials_after_expiration(self):
+    def test_get_credentials_refresher_without_mfa(self):
         role_arn = create_role(AWS_REGION_EU_WEST_1)
         session_duration_in_seconds = 900
         arguments = Namespace()
@@ -1417,15 +1626,13 @@ aws:
         arguments.session_duration = session_duration_in_seconds
         aws_provider = AwsProvider(arguments)
 
-        # Manually expire credentials
-        aws_provider._assumed_role_configuration.credentials.expiration = datetime.now(
-            get_localzone()
-        ) - timedelta(seconds=session_duration_in_seconds)
-
         current_credentials = aws_provider._assumed_role_configuration.credentials
 
-        # Refresh credentials
-        refreshed_credentials = aws_provider.refresh_credentials()
+        # Refresh credentials assuming the IAM Role again
+        refreshed_credentials = aws_provider.get_credentials_refresher(
+            aws_provider.session.original_session,
+            aws_provider._assumed_role_configuration.info,
+        )()
 
         # Assert that the refreshed credentials are different
         access_key = refreshed_credentials.get("access_key")
@@ -1438,9 +1645,7 @@ aws:
         assert session_token != current_credentials.aws_session_token
 
         expiry_time = refreshed_credentials.get("expiry_time")
-        expiry_time_formatted = datetime.fromisoformat(expiry_time)
-        assert expiry_time != current_credentials.expiration
-        assert datetime.now(get_localzone()) < expiry_time_formatted
+        assert datetime.now(get_localzone()) < parse_datetime(expiry_time)
 
         # Assert credentials format
         assert len(access_key) == 20
@@ -1450,3 +1655,55 @@ aws:
 
         assert len(session_token) == 356
         assert search(r"^FQoGZXIvYXdzE.*$", session_token)
+
+    @mock_aws
+    def test_get_credentials_refresher_with_mfa(self):
+        role_arn = create_role(AWS_REGION_EU_WEST_1)
+        arguments = Namespace()
+        arguments.role = role_arn
+        arguments.session_duration = 900
+        arguments.mfa = True
+
+        with patch(
+            "prowler.providers.aws.aws_provider.AwsProvider.__input_role_mfa_token_and_code__",
+            return_value=AWSMFAInfo(
+                arn=f"arn:aws:iam::{AWS_ACCOUNT_NUMBER}:mfa/test-role-mfa",
+                totp="111111",
+            ),
+        ) as input_role_mfa_token_and_code:
+            aws_provider = AwsProvider(arguments)
+            mfa_calls = input_role_mfa_token_and_code.call_count
+
+            refreshed_credentials = aws_provider.get_credentials_refresher(
+                aws_provider.session.original_session,
+                aws_provider._assumed_role_configuration.info,
+            )()
+
+            # The MFA token code is asked again to refresh the credentials
+            assert input_role_mfa_token_and_code.call_count == mfa_calls + 1
+            assert search(r"^ASIA.*$", refreshed_credentials["access_key"])
+            assert refreshed_credentials["secret_key"]
+            assert refreshed_credentials["token"]
+            assert datetime.now(get_localzone()) < datetime.fromisoformat(
+                refreshed_credentials["expiry_time"]
+            )
+
+    @mock_aws
+    def test_assumed_session_refreshes_expired_credentials(self):
+        role_arn = create_role(AWS_REGION_EU_WEST_1)
+        arguments = Namespace()
+        arguments.role = role_arn
+        arguments.session_duration = 900
+        aws_provider = AwsProvider(arguments)
+
+        current_credentials = aws_provider._assumed_role_configuration.credentials
+        credentials = aws_provider.session.current_session.get_credentials()
+
+        # Manually expire credentials
+        credentials._expiry_time = datetime.now(get_localzone()) - timedelta(
+            seconds=arguments.session_duration
+        )
+
+        frozen_credentials = credentials.get_frozen_credentials()
+        assert frozen_credentials.access_key != current_credentials.aws_access_key_id
+        assert search(r"^ASIA.*$", frozen_credentials.access_key)
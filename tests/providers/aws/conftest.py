@@ -0,0 +1,22 @@
+import pytest
+
+from prowler.providers.aws.aws_provider import (
+    _assumed_role_credentials_cache,
+    read_aws_regions_file,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_assumed_role_credentials_cache():
+    """Clear the credentials of the IAM Roles assumed by the AWS provider, since all the tests share the same mocked credentials"""
+    _assumed_role_credentials_cache.clear()
+    yield
+    _assumed_role_credentials_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_aws_regions_file_cache():
+    """Clear the parsed AWS services regions file, so the tests can mock it"""
+    read_aws_regions_file.cache_clear()
+    yield
+    read_aws_regions_file.cache_clear()
@@ -1,5 +1,7 @@
+import gc
 from logging import ERROR, WARNING
 from os import path
+from weakref import ref
 
 import botocore
 from boto3 import session
@@ -9,8 +11,13 @@ from mock import MagicMock, patch
 from prowler.config.config import prowler_version, timestamp_utc
 from prowler.lib.check.models import Check_Report, load_check_metadata
 from prowler.providers.aws.lib.security_hub.security_hub import (
+    __archive_previous_findings_per_region__,
+    __chunk_findings__,
+    __get_security_hub_client__,
+    _security_hub_clients,
     batch_send_to_security_hub,
     prepare_security_hub_findings,
+    resolve_security_hub_previous_findings,
     verify_security_hub_integration_enabled_per_region,
 )
 from tests.providers.aws.utils import (
@@ -89,6 +96,17 @@ def mock_make_api_call(self, operation_name, kwarg):
             ]
         }
 
+    if operation_name == "GetFindings":
+        return {
+            "Findings": [
+                get_security_hub_finding("FAILED"),
+                {
+                    **get_security_hub_finding("FAILED"),
+                    "Id": f"prowler-previous-finding-{AWS_ACCOUNT_NUMBER}-{kwarg['Filters']['Region'][0]['Value']}",
+                },
+            ]
+        }
+
     return make_api_call(self, operation_name, kwarg)
 
 
@@ -161,7 +179,7 @@ class Test_SecurityHub:
                 (
                     "root",
                     WARNING,
-                    f"ClientError -- [70]: An error occurred ({error_code}) when calling the {operation_name} operation: {error_message}",
+                    f"ClientError -- [82]: An error occurred ({error_code}) when calling the {operation_name} operation: {error_message}",
                 )
             ]
 
@@ -221,7 +239,7 @@ class Test_SecurityHub:
                 (
                     "root",
                     ERROR,
-                    f"ClientError -- [70]: An error occurred ({error_code}) when calling the {operation_name} operation: {error_message}",
+                    f"ClientError -- [82]: An error occurred ({error_code}) when calling the {operation_name} operation: {error_message}",
                 )
             ]
 
@@ -247,7 +265,7 @@ class Test_SecurityHub:
                 (
                     "root",
                     ERROR,
-                    f"Exception -- [70]: {error_message}",
+                    f"Exception -- [82]: {error_message}",
                 )
             ]
 
@@ -437,3 +455,185 @@ class Test_SecurityHub:
             )
             == 1
         )
+
+    @patch("botocore.client.BaseClient._make_api_call", new=mock_make_api_call)
+    def test_batch_send_to_security_hub_two_regions(self):
+        enabled_regions = [AWS_REGION_EU_WEST_1, AWS_REGION_EU_WEST_2]
+        output_options = self.set_mocked_output_options()
+        findings = [
+            self.generate_finding("PASS", AWS_REGION_EU_WEST_1),
+            self.generate_finding("FAIL", AWS_REGION_EU_WEST_2),
+        ]
+        aws_provider = set_mocked_aws_provider(audited_regions=enabled_regions)
+        session = self.set_mocked_session(AWS_REGION_EU_WEST_1)
+
+        security_hub_findings = prepare_security_hub_findings(
+            findings,
+            aws_provider,
+            output_options,
+            enabled_regions,
+        )
+
+        assert (
+            batch_send_to_security_hub(
+                security_hub_findings,
+                session,
+            )
+            == 2
+        )
+
+    def test_batch_send_to_security_hub_no_findings(self):
+        session = MagicMock()
+
+        assert (
+            batch_send_to_security_hub(
+                {AWS_REGION_EU_WEST_1: [], AWS_REGION_EU_WEST_2: []},
+                session,
+            )
+            == 0
+        )
+        session.client.assert_not_called()
+
+    @patch("botocore.client.BaseClient._make_api_call", new=mock_make_api_call)
+    def test_resolve_security_hub_previous_findings(self):
+        enabled_regions = [AWS_REGION_EU_WEST_1, AWS_REGION_EU_WEST_2]
+        aws_provider = set_mocked_aws_provider(audited_regions=enabled_regions)
+        aws_provider._session.current_session = self.set_mocked_session(
+            AWS_REGION_EU_WEST_1
+        )
+        security_hub_findings_per_region = {
+            AWS_REGION_EU_WEST_1: [get_security_hub_finding("FAILED")],
+            AWS_REGION_EU_WEST_2: [get_security_hub_finding("FAILED")],
+        }
+
+        # One previous finding is archived per region
+        assert (
+            resolve_security_hub_previous_findings(
+                security_hub_findings_per_region, aws_provider
+            )
+            == 2
+        )
+
+    @patch("botocore.client.BaseClient._make_api_call", new=mock_make_api_call)
+    def test_resolve_security_hub_previous_findings_client_error_in_region(
+        self, caplog
+    ):
+        caplog.set_level(ERROR)
+        enabled_regions = [AWS_REGION_EU_WEST_1, AWS_REGION_EU_WEST_2]
+        aws_provider = set_mocked_aws_provider(audited_regions=enabled_regions)
+        aws_provider._session.current_session = self.set_mocked_session(
+            AWS_REGION_EU_WEST_1
+        )
+        security_hub_findings_per_region = {
+            AWS_REGION_EU_WEST_1: [get_security_hub_finding("FAILED")],
+            AWS_REGION_EU_WEST_2: [get_security_hub_finding("FAILED")],
+        }
+        get_security_hub_client = __get_security_hub_client__
+
+        def get_security_hub_client_failing_in_eu_west_2(session, region):
+            if region == AWS_REGION_EU_WEST_2:
+                raise Exception(f"Client error in region {region}")
+            return get_security_hub_client(session, region)
+
+        with patch(
+            "prowler.providers.aws.lib.security_hub.security_hub.__get_security_hub_client__",
+            new=get_security_hub_client_failing_in_eu_west_2,
+        ):
+            # The other regions are archived
+            assert (
+                resolve_security_hub_previous_findings(
+                    security_hub_findings_per_region, aws_provider
+                )
+                == 1
+            )
+        assert f"in region {AWS_REGION_EU_WEST_2}" in caplog.text
+
+    def test_archive_previous_findings_per_region_several_pages(self):
+        previous_finding = {
+            **get_security_hub_finding("FAILED"),
+            "Id": "prowler-previous-finding",
+        }
+        base_findings_filter = {
+            "ProductName": [{"Value": "Prowler", "Comparison": "EQUALS"}],
+            "RecordState": [{"Value": "ACTIVE", "Comparison": "EQUALS"}],
+            "AwsAccountId": [{"Value": AWS_ACCOUNT_NUMBER, "Comparison": "EQUALS"}],
+        }
+        security_hub_client = MagicMock()
+        security_hub_client.get_paginator.return_value.paginate.return_value = [
+            {"Findings": [get_security_hub_finding("FAILED")]},
+            {"Findings": [previous_finding]},
+        ]
+        security_hub_client.batch_import_findings.return_value = {
+            "FailedCount": 0,
+            "SuccessCount": 1,
+        }
+
+        assert (
+            __archive_previous_findings_per_region__(
+                AWS_REGION_EU_WEST_1,
+                {get_security_hub_finding("FAILED")["Id"]},
+                security_hub_client,
+                base_findings_filter,
+            )
+            == 1
+        )
+        security_hub_client.get_paginator.assert_called_once_with("get_findings")
+        security_hub_client.get_paginator.return_value.paginate.assert_called_once_with(
+            Filters={
+                **base_findings_filter,
+                "Region": [{"Value": AWS_REGION_EU_WEST_1, "Comparison": "EQUALS"}],
+            }
+        )
+        archived_findings = security_hub_client.batch_import_findings.call_args.kwargs[
+            "Findings"
+        ]
+        assert [finding["Id"] for finding in archived_findings] == [
+            "prowler-previous-finding"
+        ]
+        assert archived_findings[0]["RecordState"] == "ARCHIVED"
+
+    def test_resolve_security_hub_previous_findings_no_regions(self):
+        aws_provider = set_mocked_aws_provider()
+
+        assert resolve_security_hub_previous_findings({}, aws_provider) == 0
+
+    def test_get_security_hub_client_reused(self):
+        session = self.set_mocked_session(AWS_REGION_EU_WEST_1)
+
+        security_hub_client = __get_security_hub_client__(session, AWS_REGION_EU_WEST_1)
+        assert (
+            __get_security_hub_client__(session, AWS_REGION_EU_WEST_1)
+            is security_hub_client
+        )
+        assert (
+            __get_security_hub_client__(session, AWS_REGION_EU_WEST_2)
+            is not security_hub_client
+        )
+        assert (
+            __get_security_hub_client__(
+                self.set_mocked_session(AWS_REGION_EU_WEST_1), AWS_REGION_EU_WEST_1
+            )
+            is not security_hub_client
+        )
+
+    def test_get_security_hub_client_released_with_session(self):
+        session = self.set_mocked_session(AWS_REGION_EU_WEST_1)
+        __get_security_hub_client__(session, AWS_REGION_EU_WEST_1)
+        session_reference = ref(session)
+        assert session in _security_hub_clients
+
+        del session
+        gc.collect()
+
+        assert session_reference() is None
+
+    def test_chunk_findings(self):
+        findings = [{"Id": str(finding_id)} for finding_id in range(250)]
+
+        chunks = list(__chunk_findings__(findings, 100))
+
+        assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+        assert [finding for chunk in chunks for finding in chunk] == findings
+
+    def test_chunk_findings_empty(self):
+        assert list(__chunk_findings__([], 100)) == []
@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from mock import MagicMock
+
+from prowler.providers.common.common import get_global_provider, set_global_provider
+
+
+class Test_Common:
+    def teardown_method(self):
+        set_global_provider(None)
+
+    def test_set_global_provider(self):
+        provider = MagicMock()
+
+        set_global_provider(provider)
+
+        assert get_global_provider() is provider
+
+    def test_set_global_provider_per_context(self):
+        main_provider = MagicMock()
+        set_global_provider(main_provider)
+
+        def set_and_get_global_provider(provider):
+            set_global_provider(provider)
+            return get_global_provider()
+
+        providers = [MagicMock(), MagicMock()]
+        assert [
+            copy_context().run(set_and_get_global_provider, provider)
+            for provider in providers
+        ] == providers
+        # The other contexts keep their own provider
+        assert get_global_provider() is main_provider
+
+    def test_get_global_provider_from_thread_with_context(self):
+        provider = MagicMock()
+        set_global_provider(provider)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert (
+                executor.submit(copy_context().run, get_global_provider).result()
+                is provider
+            )